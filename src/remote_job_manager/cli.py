@@ -2,12 +2,14 @@ import typer
 import questionary
 from rich import print
 from pathlib import Path
-from omegaconf import DictConfig, OmegaConf
 import subprocess
+import shlex
 import shutil
 import uuid
 import os
-from .utils import ensure_project_initialized
+import math
+import sys
+from .utils import ensure_project_initialized, forget_project_initialized
 from .config import load_project_config, save_project_config
 from .web_utils import clone_repo, download_dataset
 from .docker_utils import run_test_in_container, list_images, run_command_in_container, create_docker_template
@@ -18,38 +20,61 @@ import yaml
 
 app = typer.Typer()
 
+state = {"noninteractive": False}
+
+@app.callback()
+def main(
+    yes: bool = typer.Option(False, "--yes", "-y", envvar="RJM_NONINTERACTIVE", help="Run non-interactively, answering every prompt with its default."),
+):
+    state["noninteractive"] = yes
+
+def _confirm(text: str, default: bool = False) -> bool:
+    """typer.confirm that returns the default when running non-interactively."""
+    if state["noninteractive"]:
+        return default
+    return typer.confirm(text, default=default)
+
+def _prompt(text: str, **kwargs):
+    """typer.prompt that returns the default when running non-interactively."""
+    if state["noninteractive"]:
+        if "default" not in kwargs:
+            print(f"Error: '{text}' has no default and cannot be answered non-interactively.")
+            raise typer.Exit(code=1)
+        return kwargs["default"]
+    return typer.prompt(text, **kwargs)
+
 def _add_cluster_command():
     """
     Adds a new global cluster configuration with slurm/remote sections.
     """
     print("Adding a new global cluster configuration...")
-    cluster_name = typer.prompt("Cluster name")
+    cluster_name = _prompt("Cluster name")
 
     # -------------------------
     # SLURM CONFIG SECTION
     # -------------------------
     slurm_config = {
-        "time": typer.prompt("Default job time (e.g., 01:00:00)"),
-        "memory": typer.prompt("Default memory (e.g., 32G)"),
-        "gres": typer.prompt("GPU type (e.g., gpu:a100:1 or gpu:1)"),
-        "cpus-per-task": typer.prompt("Default number of CPUs", type=int),
-        "mail-user": typer.prompt("SLURM Email"),
-        "mail-type": typer.prompt("email type (BEGIN,END,FAIL,ALL)", default="ALL"),        
-        "modules": typer.prompt(
+        "time": _prompt("Default job time (e.g., 01:00:00)"),
+        "memory": _prompt("Default memory (e.g., 32G)"),
+        "gres": _prompt("GPU type (e.g., gpu:a100:1 or gpu:1)"),
+        "cpus-per-task": _prompt("Default number of CPUs", type=int),
+        "mail-user": _prompt("SLURM Email"),
+        "mail-type": _prompt("email type (BEGIN,END,FAIL,ALL)", default="ALL"),        
+        "modules": _prompt(
             "Modules to load (separate by commas)", 
             default=""
         ).split(","),
-        "path_to_project_main": typer.prompt("Path to project main (ex, /path/to/project/main)", default=""),
+        "path_to_project_main": _prompt("Path to project main (ex, /path/to/project/main)", default=""),
     }
 
 
     # -------------------------
     # REMOTE CONFIG SECTION
     # -------------------------
-    remote_host = typer.prompt("Remote host")
-    remote_user = typer.prompt("Remote user")
-    remote_port = typer.prompt("Remote port", default="22")
-    remote_base_path = typer.prompt(
+    remote_host = _prompt("Remote host")
+    remote_user = _prompt("Remote user")
+    remote_port = _prompt("Remote port", default="22")
+    remote_base_path = _prompt(
         "Remote base path", 
         default="~/remote-job-manager-workspace"
     )
@@ -61,11 +86,11 @@ def _add_cluster_command():
         "remote_base_path": remote_base_path,
     }
 
-    if typer.confirm("Add initial commands for this remote?"):
+    if _confirm("Add initial commands for this remote?"):
         cmds = []
         print("Enter commands one per line (empty line to finish):")
         while True:
-            cmd = typer.prompt("", default="", show_default=False)
+            cmd = _prompt("", default="", show_default=False)
             if not cmd:
                 break
             cmds.append(cmd)
@@ -113,7 +138,9 @@ def dispatch_to_remote_if_needed(ctx: typer.Context, remote: str, project_name:
     remote_project_dir = f"{remote_base_path}/{project_name}"
 
     # Reconstruct the command string to be run remotely.
-    command_str = f"cd {remote_project_dir} && job-manager {ctx.invoked_subcommand} --project-name {project_name}"
+    # Non-interactive mode is carried over, or the remote side would still prompt.
+    global_flags = " --yes" if state["noninteractive"] else ""
+    command_str = f"cd {remote_project_dir} && job-manager{global_flags} {ctx.invoked_subcommand} --project-name {project_name}"
 
     print(f"Dispatching command to remote '{remote}'...")
     remote_manager.sync_project_to_remote(remote_config, project_name)
@@ -125,6 +152,7 @@ def init(project_name: str = typer.Option(..., "--project-name", "-n", help="The
     """
     Initialize a new project by creating an output directory and a config.yaml file.
     """
+    forget_project_initialized(project_name)
     ensure_project_initialized(project_name)
     
     config = {
@@ -137,31 +165,34 @@ def init(project_name: str = typer.Option(..., "--project-name", "-n", help="The
             "run_command": "",
             "gpus": False,
             "wandb_mode": "offline",
+            "full_history": False,
         }
     }
 
-    if typer.confirm("Do you want to configure the test information now?"):
+    if _confirm("Do you want to configure the test information now?"):
         print("Please provide the following information for your project's test setup:")
-        repo_url = typer.prompt("Git repository URL")
-        dataset_command = typer.prompt("Dataset download command (optional)", default="")
-        run_command = typer.prompt("Test run command")
-        use_gpus = typer.confirm("Enable GPU support for tests?")
+        repo_url = _prompt("Git repository URL")
+        dataset_command = _prompt("Dataset download command (optional)", default="")
+        run_command = _prompt("Test run command")
+        use_gpus = _confirm("Enable GPU support for tests?")
+        full_history = _confirm("Clone the full git history (needed for git describe, tags, setuptools-scm)?")
         print("Remember to log in to W&B on the host, and avoid hardcoding the mode in the repo config.")
-        wandb_mode = typer.prompt("W&B mode (offline, online)", default="offline")
+        wandb_mode = _prompt("W&B mode (offline, online)", default="offline")
         config["test"] = {
             "repo_url": repo_url,
             "dataset_command": dataset_command,
             "run_command": run_command,
             "gpus": use_gpus,
             "wandb_mode": wandb_mode,
+            "full_history": full_history,
         }
 
     # Create Hydra config structure
-    conf_dir = Path("output") / project_name / "conf"
-    (conf_dir / "cluster").mkdir(parents=True, exist_ok=True)
-    (conf_dir / "experiment").mkdir(parents=True, exist_ok=True)
-    (conf_dir / "grid").mkdir(parents=True, exist_ok=True)
-    (conf_dir / "project").mkdir(parents=True, exist_ok=True)
+    project_dir = Path("output") / project_name
+    conf_dir = project_dir / "conf"
+    conf_dir.mkdir(parents=True, exist_ok=True)
+    for sub in ("cluster", "experiment", "grid", "project"):
+        (conf_dir / sub).mkdir(exist_ok=True)
 
     # Create a main config.yaml as the entry point for Hydra
     with open(conf_dir / "config.yaml", "w") as f:
@@ -206,10 +237,13 @@ def init(project_name: str = typer.Option(..., "--project-name", "-n", help="The
     available_clusters = [f.stem for f in global_cluster_dir.glob("*.yaml")]
     choices = available_clusters + ["<Create new cluster config>"]
 
-    selected = questionary.select(
-        "Select a cluster config to associate with this project:",
-        choices=choices
-    ).ask()
+    if state["noninteractive"]:
+        selected = ""
+    else:
+        selected = questionary.select(
+            "Select a cluster config to associate with this project:",
+            choices=choices
+        ).ask()
 
     if selected is None:
         print("Cancelled.")
@@ -228,12 +262,12 @@ def init(project_name: str = typer.Option(..., "--project-name", "-n", help="The
     save_project_config(project_name, config)
     create_docker_template(project_name)
 
-    test_dir = Path("output") / project_name / "test"
+    test_dir = project_dir / "test"
     test_dir.mkdir(parents=True, exist_ok=True)
 
     test_config = config.get("test", {})
     repo_url = test_config.get("repo_url")
-    clone_repo(repo_url, test_dir)
+    clone_repo(repo_url, test_dir, full_history=test_config.get("full_history", False))
 
     print(f"Project '{project_name}' initialized successfully.")
 
@@ -256,15 +290,19 @@ def configure(
     if 'remotes' not in config:
         config['remotes'] = {}
 
-    if typer.confirm("Do you want to configure the test information?"):
+    if _confirm("Do you want to configure the test information?"):
         print("Please provide the new test information (press Enter to keep the current value):")
         
-        repo_url = typer.prompt("Git repository URL", default=config.get("test", {}).get("repo_url", ""))
-        dataset_command = typer.prompt("Dataset download command (optional)", default=config.get("test", {}).get("dataset_command", ""))
-        run_command = typer.prompt("Test run command", default=config.get("test", {}).get("run_command", ""))
-        use_gpus = typer.confirm("Enable GPU support for tests?", default=config.get("test", {}).get("gpus", False))
+        repo_url = _prompt("Git repository URL", default=config.get("test", {}).get("repo_url", ""))
+        dataset_command = _prompt("Dataset download command (optional)", default=config.get("test", {}).get("dataset_command", ""))
+        run_command = _prompt("Test run command", default=config.get("test", {}).get("run_command", ""))
+        use_gpus = _confirm("Enable GPU support for tests?", default=config.get("test", {}).get("gpus", False))
+        full_history = _confirm(
+            "Clone the full git history (needed for git describe, tags, setuptools-scm)?",
+            default=config.get("test", {}).get("full_history", False),
+        )
         print("Remember to log in to W&B on the host, and avoid hardcoding the mode in the repo config.")
-        wandb_mode = typer.prompt("W&B mode (offline, online)", default=config.get("test", {}).get("wandb_mode", "offline"))
+        wandb_mode = _prompt("W&B mode (offline, online)", default=config.get("test", {}).get("wandb_mode", "offline"))
 
         config["test"] = {
             "repo_url": repo_url,
@@ -272,9 +310,10 @@ def configure(
             "run_command": run_command,
             "gpus": use_gpus,
             "wandb_mode": wandb_mode,
+            "full_history": full_history,
         }
 
-    if typer.confirm("Do you want to manage remote configurations?"):
+    if _confirm("Do you want to manage remote configurations?"):
         while True:
             print("\n[bold]Current Remotes:[/bold]")
             if not config["remotes"]:
@@ -288,17 +327,17 @@ def configure(
                         for cmd in details["init_commands"]:
                             print(f"      - {cmd}")
             
-            action = typer.prompt("\n[A]dd, [U]pdate, [R]emove, or [F]inish?", default="F").upper()
+            action = _prompt("\n[A]dd, [U]pdate, [R]emove, or [F]inish?", default="F").upper()
 
             if action == "F":
                 break
             
             if action == "A":
-                remote_name = typer.prompt("Enter a name for the new remote")
-                remote_host = typer.prompt("Remote host address")
-                remote_user = typer.prompt("Remote user")
-                remote_port = typer.prompt("Remote port", default="22")
-                remote_base_path = typer.prompt("Remote base path", default="~/remote-job-manager-workspace")
+                remote_name = _prompt("Enter a name for the new remote")
+                remote_host = _prompt("Remote host address")
+                remote_user = _prompt("Remote user")
+                remote_port = _prompt("Remote port", default="22")
+                remote_base_path = _prompt("Remote base path", default="~/remote-job-manager-workspace")
                 config["remotes"][remote_name] = {
                     "host": remote_host, 
                     "user": remote_user, 
@@ -306,11 +345,11 @@ def configure(
                     "remote_base_path": remote_base_path,
                 }
                 
-                if typer.confirm("Do you want to add initial commands for this remote?"):
+                if _confirm("Do you want to add initial commands for this remote?"):
                     init_commands = []
                     print("Enter initial commands one by one (press Enter on an empty line to finish):")
                     while True:
-                        command = typer.prompt("", default="", show_default=False)
+                        command = _prompt("", default="", show_default=False)
                         if not command:
                             break
                         init_commands.append(command)
@@ -319,14 +358,14 @@ def configure(
                 print(f"Remote '{remote_name}' added.")
 
             elif action == "U":
-                remote_name = typer.prompt("Enter the name of the remote to update")
+                remote_name = _prompt("Enter the name of the remote to update")
                 if remote_name in config["remotes"]:
                     print("Enter new values (press Enter to keep current):")
                     current = config["remotes"][remote_name]
-                    remote_host = typer.prompt("Remote host address", default=current["host"])
-                    remote_user = typer.prompt("Remote user", default=current["user"])
-                    remote_port = typer.prompt("Remote port", default=str(current["port"]))
-                    remote_base_path = typer.prompt("Remote base path", default=current.get("remote_base_path", "~/remote-job-manager-workspace"))
+                    remote_host = _prompt("Remote host address", default=current["host"])
+                    remote_user = _prompt("Remote user", default=current["user"])
+                    remote_port = _prompt("Remote port", default=str(current["port"]))
+                    remote_base_path = _prompt("Remote base path", default=current.get("remote_base_path", "~/remote-job-manager-workspace"))
                     config["remotes"][remote_name] = {
                         "host": remote_host, 
                         "user": remote_user, 
@@ -334,12 +373,12 @@ def configure(
                         "remote_base_path": remote_base_path,
                     }
 
-                    if typer.confirm("Do you want to update the initial commands for this remote?"):
+                    if _confirm("Do you want to update the initial commands for this remote?"):
                         init_commands = []
                         print("Current initial commands:", current.get("init_commands", "None"))
                         print("Enter new initial commands one by one (press Enter on an empty line to finish):")
                         while True:
-                            command = typer.prompt("", default="", show_default=False)
+                            command = _prompt("", default="", show_default=False)
                             if not command:
                                 break
                             init_commands.append(command)
@@ -350,7 +389,7 @@ def configure(
                     print(f"Error: Remote '{remote_name}' not found.")
 
             elif action == "R":
-                remote_name = typer.prompt("Enter the name of the remote to remove")
+                remote_name = _prompt("Enter the name of the remote to remove")
                 if remote_name in config["remotes"]:
                     del config["remotes"][remote_name]
                     print(f"Remote '{remote_name}' removed.")
@@ -385,8 +424,10 @@ def build(
 
     uid = os.getuid()
     gid = os.getgid()
+    # An absolute executable path and close_fds=False keep Popen on the
+    # posix_spawn fast path instead of fork+exec of this process.
     docker_cmd = [
-        "docker", "build",
+        shutil.which("docker") or "docker", "build",
         "--build-arg", f"USER_ID={uid}",
         "--build-arg", f"GROUP_ID={gid}",
         "-t", image_tag,
@@ -395,14 +436,11 @@ def build(
     ]
 
     try:
-        process = subprocess.Popen(
-            docker_cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-        )
-        for line in iter(process.stdout.readline, ''):
-            print(line, end='')
+        # Docker output is not inspected, so both streams are inherited and go
+        # straight to the terminal without passing through Python (or Rich).
+        # Redirecting stderr to stdout would rule out posix_spawn.
+        sys.stdout.flush()
+        process = subprocess.Popen(docker_cmd, close_fds=False)
         process.wait()
         if process.returncode != 0:
             raise subprocess.CalledProcessError(process.returncode, process.args)
@@ -454,24 +492,7 @@ def template(
     """
     dispatch_to_remote_if_needed(ctx, remote, project_name)
 
-    ensure_project_initialized(project_name)
-    template_path = Path(__file__).parent / "templates" / "Dockerfile.template"
-    with open(template_path, "r") as f:
-        template_content = f.read()
-
-    dockerfile_content = template_content.replace("{{ project_name }}", project_name)
-
-    output_dir = Path("output") / project_name
-    dockerfile_path = output_dir / "Dockerfile"
-    requirements_path = output_dir / "requirements.txt"
-
-    with open(dockerfile_path, "w") as f:
-        f.write(dockerfile_content)
-
-    with open(requirements_path, "w") as f:
-        pass  # Create an empty file
-
-    print(f"Dockerfile and requirements.txt created successfully in: {output_dir}")
+    create_docker_template(project_name)
 
 @app.command()
 def test(
@@ -496,11 +517,12 @@ def test(
     run_command = test_config.get("run_command")
     use_gpus = test_config.get("gpus", False)
     wandb_mode = test_config.get("wandb_mode", "offline")
+    full_history = test_config.get("full_history", False)
 
     test_dir = Path("output") / project_name / "test"
     test_dir.mkdir(parents=True, exist_ok=True)
 
-    clone_repo(repo_url, test_dir)
+    clone_repo(repo_url, test_dir, full_history=full_history)
     download_dataset(dataset_command, test_dir)
 
     image_tag = f"{project_name}:latest"
@@ -523,7 +545,8 @@ def test_singularity(
         print(f"Error: config.yaml not found for project '{project_name}'. Please run 'init' first.")
         raise typer.Exit(code=1)
 
-    sif_path = Path("output") / project_name / f"{project_name}.sif"
+    project_dir = Path("output") / project_name
+    sif_path = project_dir / f"{project_name}.sif"
     if not sif_path.exists():
         print(f"Error: Singularity image not found at {sif_path}. Please run 'convert' first.")
         raise typer.Exit(code=1)
@@ -534,15 +557,16 @@ def test_singularity(
     run_command = test_config.get("run_command")
     use_gpus = test_config.get("gpus", False)
     wandb_mode = test_config.get("wandb_mode", "offline")
+    full_history = test_config.get("full_history", False)
 
     if not repo_url or not run_command:
         print("Error: 'repo_url' and 'run_command' must be defined in the 'test' section of config.yaml.")
         raise typer.Exit(code=1)
 
-    test_dir = Path("output") / project_name / "test"
+    test_dir = project_dir / "test"
     test_dir.mkdir(parents=True, exist_ok=True)
 
-    clone_repo(repo_url, test_dir)
+    clone_repo(repo_url, test_dir, full_history=full_history)
     download_dataset(dataset_command, test_dir)
 
     run_command = run_command.replace("<YOUR_DATA_DIRECTORY>", str(test_dir.resolve()))
@@ -619,7 +643,7 @@ def fix_and_rerun(
 
     try:
         while True:
-            fix_cmd = typer.prompt(
+            fix_cmd = _prompt(
                 "Enter a command to fix dependencies (e.g., 'pip install numpy'), or press Enter to re-run",
                 default="", show_default=False
             )
@@ -633,12 +657,13 @@ def fix_and_rerun(
             run_command_in_container(container_name, run_command, workdir)
             print("--- Test Finished ---")
 
-            if not typer.confirm("Do you want to try another fix?"):
+            if not _confirm("Do you want to try another fix?"):
                 break
     finally:
         print(f"Stopping and removing live container '{container_name}'...")
-        subprocess.run(["docker", "stop", container_name], check=False, capture_output=True)
-        subprocess.run(["docker", "rm", container_name], check=False, capture_output=True)
+        docker_bin = shutil.which("docker") or "docker"
+        subprocess.run([docker_bin, "stop", container_name], check=False, capture_output=True, close_fds=False)
+        subprocess.run([docker_bin, "rm", container_name], check=False, capture_output=True, close_fds=False)
 
     print("\n[bold yellow]Reminder:[/bold yellow] The fixes you made were temporary.")
     print("For a permanent fix, please update your 'requirements.txt' and run the 'build' command.")
@@ -687,15 +712,15 @@ def shell(
 def _create_experiment_config(project_name: str, config_name: str = None) -> str:
     """Internal function to create a base experiment config."""
     if not config_name:
-        config_name = typer.prompt("Configuration name (e.g., 'bert_base')")
+        config_name = _prompt("Configuration name (e.g., 'bert_base')")
 
     print("\n--- Configuring Fixed Parameters ---")
     fixed_params = {}
-    fixed_params['script'] = typer.prompt("Enter the base script to run (e.g., python train.py)")
-    fixed_params['wandb_mode'] = typer.prompt("W&B mode (offline, online)", default="offline")
+    fixed_params['script'] = _prompt("Enter the base script to run (e.g., python train.py)")
+    fixed_params['wandb_mode'] = _prompt("W&B mode (offline, online)", default="offline")
     print("Enter fixed parameters (key=value), one per line. Press Enter on an empty line to finish.")
     while True:
-        param = typer.prompt("", default="", show_default=False)
+        param = _prompt("", default="", show_default=False)
         if not param:
             break
         if "=" not in param:
@@ -716,13 +741,13 @@ def _create_experiment_config(project_name: str, config_name: str = None) -> str
 def _create_grid_config(project_name: str, config_name: str = None) -> str:
     """Internal function to create a grid search config."""
     if not config_name:
-        config_name = typer.prompt("Configuration name (e.g., 'lr_sweep')")
+        config_name = _prompt("Configuration name (e.g., 'lr_sweep')")
 
     print("\n--- Configuring Grid Search Parameters ---")
     grid_params = {}
     print("Enter grid parameters (key=value1,value2,...), one per line. Press Enter on an empty line to finish.")
     while True:
-        param = typer.prompt("", default="", show_default=False)
+        param = _prompt("", default="", show_default=False)
         if not param:
             break
         if "=" not in param:
@@ -777,10 +802,14 @@ def add_experiment_command(
     available_exp_configs = [f.stem for f in exp_dir.glob("*.yaml")]
     choices = available_exp_configs + ["<Create new experiment config>"]
 
-    selected = questionary.select(
-        "Select a base experiment config:",
-        choices=choices
-    ).ask()
+    if state["noninteractive"]:
+        # questionary's default answer is the first choice
+        selected = choices[0]
+    else:
+        selected = questionary.select(
+            "Select a base experiment config:",
+            choices=choices
+        ).ask()
 
     if selected is None:
         print("Cancelled.")
@@ -796,7 +825,7 @@ def add_experiment_command(
     # --- Step 2: Create Grid Config for this Run ---
     print(f"\nNow, let's create a grid search for the '{base_exp_config_name}' experiment.")
     grid_name_suggestion = f"{base_exp_config_name}_grid_{uuid.uuid4().hex[:4]}"
-    grid_config_name = typer.prompt(f"Enter a name for this new grid configuration", default=grid_name_suggestion)
+    grid_config_name = _prompt(f"Enter a name for this new grid configuration", default=grid_name_suggestion)
     
     _create_grid_config(project_name, grid_config_name)
 
@@ -819,8 +848,11 @@ def generate_slurm_command(
     """
     ensure_project_initialized(project_name)
 
+    from omegaconf import OmegaConf
+
     # ----- Load config files manually (NO multirun) -----
-    conf_dir = Path("output") / project_name / "conf"
+    project_dir = Path("output") / project_name
+    conf_dir = project_dir / "conf"
     
     experiment = OmegaConf.load(conf_dir / "experiment" / f"{experiment_config}.yaml")
     grid = OmegaConf.load(conf_dir / "grid" / f"{grid_config}.yaml")
@@ -829,29 +861,25 @@ def generate_slurm_command(
 
     # ----- Create output dir -----
     experiment_name = f"{experiment_config}__{grid_config}"
-    slurm_output_dir = Path("output") / project_name / "slurm_runs" / experiment_name
+    slurm_output_dir = project_dir / "slurm_runs" / experiment_name
     slurm_output_dir.mkdir(parents=True, exist_ok=True)
 
     # ----- Cartesian product of grid -----
+    # Each override string is formatted once per axis value, not per combination.
     from itertools import product
 
-    grid_keys = list(grid.keys())
-    grid_values = [grid[k] for k in grid_keys]
-    combinations = list(product(*grid_values))
+    grid_args = [[f"+{key}={val}" for val in grid[key]] for key in grid.keys()]
+    total = math.prod(len(args) for args in grid_args)
 
-    print(f"Generating {len(combinations)} SLURM scripts...")
+    print(f"Generating {total} SLURM scripts...")
 
-    job_launcher_script = Path(__file__).parent / "job_launcher.py"
-
-    for job_idx, combo in enumerate(combinations):
+    job_launcher_script = str((Path(__file__).parent / "job_launcher.py").resolve())
 
-        cli_args = []
-        for key, val in zip(grid_keys, combo):
-            cli_args.append(f"+{key}={val}")
+    for job_idx, cli_args in enumerate(product(*grid_args)):
 
         command = [
             "python",
-            str(job_launcher_script.resolve()),
+            job_launcher_script,
             f"--config-dir={conf_dir}",
             "--config-name=config",
             f"experiment={experiment_config}",
@@ -859,11 +887,11 @@ def generate_slurm_command(
             "no_submit=True",
             f"slurm_output_dir={slurm_output_dir}",
             f"job_index={job_idx}",
-        ] + cli_args
+            *cli_args,
+        ]
 
-        command_str = " ".join(command)
-        print(f"\n[blue]Running:[/blue] {command_str}\n")
-        subprocess.run(command_str, shell=True)
+        print(f"\n[blue]Running:[/blue] {shlex.join(command)}\n")
+        subprocess.run(command)
 
     print(f"\n[green]All SLURM scripts saved into: {slurm_output_dir}[/green]")
 @app.command(name="submit-slurm")
@@ -905,11 +933,10 @@ def submit_slurm_command(
         print(f"Syncing project to remote '{remote}' before submission...")
         remote_manager.sync_project_to_remote(remote_config, project_name)
 
-        for script_path in scripts_to_submit:
-            remote_script_path = f"{remote_scripts_dir}/{script_path.name}"
-            submit_cmd = f"sbatch {remote_script_path}"
-            print(f"Submitting on remote: {submit_cmd}")
-            remote_manager.run_remote_command(remote_config, submit_cmd)
+        # Independent sbatch calls: submit them concurrently over the shared SSH connection
+        submit_cmds = [f"sbatch {remote_scripts_dir}/{script_path.name}" for script_path in scripts_to_submit]
+        print(f"Submitting {len(submit_cmds)} scripts on remote '{remote}'...")
+        remote_manager.run_remote_commands_parallel(remote_config, submit_cmds)
     else:
         # Local submission
         for script_path in scripts_to_submit:
@@ -956,9 +983,8 @@ def generate_and_submit_command(
     ] + ctx.args
 
     print("Invoking Hydra to generate and submit jobs...")
-    command_str = " ".join(command)
-    print(f"Command: {command_str}")
-    subprocess.run(command_str, shell=True, cwd=project_output_dir)
+    print(f"Command: {shlex.join(command)}")
+    subprocess.run(command, cwd=project_output_dir)
 
 if __name__ == "__main__":
     app()
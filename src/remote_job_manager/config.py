@@ -1,6 +1,86 @@
+import copy
+import json
+import os
 import yaml
+from collections import OrderedDict
 from pathlib import Path
 
+# Prefer the libyaml-backed C loader/dumper when PyYAML was built with it.
+try:
+    from yaml import CSafeLoader as _SafeLoader, CSafeDumper as _SafeDumper
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader, SafeDumper as _SafeDumper
+
+# Parsed config files keyed by path, validated against (mtime, size).
+_CONFIG_CACHE_MAX = 100
+_CONFIG_CACHE: "OrderedDict[str, tuple[int, int, object]]" = OrderedDict()
+
+def load_cached(path: Path, parse):
+    """
+    Parses a config file with `parse(file)`, reusing the result while the file is unchanged.
+    A deep copy is returned so callers can mutate it freely.
+    """
+    key = str(path)
+    st = os.stat(key)
+    cached = _CONFIG_CACHE.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        _CONFIG_CACHE.move_to_end(key)
+        return copy.deepcopy(cached[2])
+
+    with open(key, 'r') as f:
+        data = parse(f)
+    _CONFIG_CACHE[key] = (st.st_mtime_ns, st.st_size, data)
+    _CONFIG_CACHE.move_to_end(key)
+    if len(_CONFIG_CACHE) > _CONFIG_CACHE_MAX:
+        _CONFIG_CACHE.popitem(last=False)
+    return copy.deepcopy(data)
+
+def load_yaml(path: Path):
+    """
+    Loads a YAML file through the config cache.
+    """
+    return load_cached(path, _load_yaml_with_json_cache)
+
+def _json_sidecar(path: Path) -> Path:
+    return path.with_suffix(path.suffix + ".json")
+
+def _load_yaml_with_json_cache(f):
+    """
+    Parses an open YAML file, going through a `<name>.json` sidecar that is
+    trusted only while the YAML's (mtime, size) match the ones recorded in it.
+    """
+    path = Path(f.name)
+    sidecar = _json_sidecar(path)
+    st = os.fstat(f.fileno())
+    source = [st.st_mtime_ns, st.st_size]
+    try:
+        with open(sidecar, 'r') as jf:
+            cached = json.load(jf)
+        if cached.get("source") == source:
+            return cached["data"]
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass
+
+    data = yaml.load(f, Loader=_SafeLoader)
+    try:
+        text = json.dumps({"source": source, "data": data})
+        # Only keep the sidecar if JSON round-trips the data unchanged
+        # (e.g. no dates or non-string keys).
+        if json.loads(text)["data"] == data:
+            sidecar.write_text(text)
+    except (OSError, TypeError, ValueError):
+        pass
+    return data
+
+def invalidate(path: Path = None):
+    """
+    Drops a single file, or the whole config cache when no path is given.
+    """
+    if path is None:
+        _CONFIG_CACHE.clear()
+    else:
+        _CONFIG_CACHE.pop(str(path), None)
+
 def get_project_config_path(project_name: str) -> Path:
     """
     Returns the path to the config.yaml file for a given project.
@@ -15,9 +95,7 @@ def load_project_config(project_name: str) -> dict:
     config_path = get_project_config_path(project_name)
     if not config_path.exists():
         return None
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
-    return config
+    return load_yaml(config_path)
 
 def save_project_config(project_name: str, config: dict):
     """
@@ -25,4 +103,6 @@ def save_project_config(project_name: str, config: dict):
     """
     config_path = get_project_config_path(project_name)
     with open(config_path, 'w') as f:
-        yaml.dump(config, f)
+        yaml.dump(config, f, Dumper=_SafeDumper)
+    invalidate(config_path)
+    _json_sidecar(config_path).unlink(missing_ok=True)
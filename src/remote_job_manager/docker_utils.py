@@ -1,27 +1,75 @@
+import functools
 import subprocess
 from pathlib import Path
 from rich import print
 import typer
 import os
+import sys
 import uuid
 from .wandb_utils import add_wandb_volumes
 from .utils import ensure_project_initialized
 
+@functools.lru_cache(maxsize=None)
+def _jinja_env():
+    """
+    Shared Jinja2 environment, built on first use; compiled templates are cached across calls.
+    """
+    from jinja2 import Environment, FileSystemLoader
+
+    return Environment(
+        loader=FileSystemLoader(Path(__file__).parent / "templates"),
+        auto_reload=False,
+        cache_size=64,
+        keep_trailing_newline=True,
+    )
+
+# Host user's UID and GID, looked up once per process
+_UID = os.getuid() if hasattr(os, "getuid") else 0
+_GID = os.getgid() if hasattr(os, "getgid") else 0
+
+# Wandb-related error patterns to detect in container logs
+WANDB_ERROR_PATTERNS = (
+    "failed to get API key",
+    "Unable to verify login",
+    "netrc",
+    "permission denied",
+    "ERROR main: failed to get logger path",
+)
+# Encoded once; bytes.find (memmem) per pattern beats a regex alternation here.
+_WANDB_ERROR_PATTERNS_B = tuple(p.encode() for p in WANDB_ERROR_PATTERNS)
+# Bytes of the previous chunk rescanned with the next, so a pattern split
+# across two reads is still found.
+_WANDB_PATTERN_OVERLAP = max(len(p) for p in _WANDB_ERROR_PATTERNS_B) - 1
+
+def _find_wandb_error(data: bytes) -> int:
+    """
+    Returns the end offset of the earliest W&B error pattern in data, or -1.
+    """
+    found = -1
+    for pattern in _WANDB_ERROR_PATTERNS_B:
+        index = data.find(pattern)
+        if index != -1 and (found == -1 or index + len(pattern) < found):
+            found = index + len(pattern)
+    return found
+
+def _line_end(data: bytes, start: int) -> int:
+    """
+    Returns the offset just past the first line terminator (\\n or \\r) at or after start, or -1.
+    """
+    ends = [i for i in (data.find(b"\n", start), data.find(b"\r", start)) if i != -1]
+    return min(ends) + 1 if ends else -1
+
 def run_test_in_container(image_tag: str, test_dir: Path, run_command: str, project_name:str, use_gpus: bool = False, wandb_mode: str = "offline") -> None:
     """
     Runs a test command inside a Docker container.
     """
     print(f"Running test command in Docker container for image: {image_tag}")
 
-    docker_command = ["docker", "run", "--rm"]
+    # Run the container as the host user to avoid permission issues
+    # with files created in the mounted volume
+    docker_command = ["docker", "run", "--rm", "-u", f"{_UID}:{_GID}"]
     if use_gpus:
         docker_command.extend(["--runtime=nvidia", "--gpus", "all"])
-    
-    # Get host user's UID and GID to run the container with the same user
-    # This avoids permission issues with files created in the mounted volume
-    uid = os.getuid()
-    gid = os.getgid()
-    docker_command.extend(["-u", f"{uid}:{gid}"])
 
     docker_command = add_wandb_volumes(docker_command, wandb_mode)
     docker_command.extend([
@@ -30,48 +78,66 @@ def run_test_in_container(image_tag: str, test_dir: Path, run_command: str, proj
         "sh", "-c", run_command
     ])
 
-    # Wandb-related error patterns to detect
-    wandb_error_patterns = [
-        "failed to get API key",
-        "Unable to verify login",
-        "netrc",
-        "permission denied",
-        "ERROR main: failed to get logger path"
-    ]
-
     wandb_error_detected = False
 
+    out = sys.stdout.buffer
+
+    def warn_wandb_error():
+        print(
+            "\033[91m\n"
+            "⚠️  WARNING: W&B authentication failed inside the container.\n"
+            "\033[93mRemember to log in to W&B on the host,\n"
+            "and avoid hardcoding the mode in the repo config.\033[0m\n"
+        )
+
     try:
         process = subprocess.Popen(
             docker_command,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
         )
+        sys.stdout.flush()
 
-        for line in iter(process.stdout.readline, ''):
-
-            # If first W&B error already triggered → stop printing logs
+        # Each chunk is written as soon as it is read, so \r progress bars stay
+        # live. Output stops after the line holding the first W&B error; the
+        # pipe is still drained so the container never blocks on it.
+        fd = process.stdout.fileno()
+        tail = b""
+        in_error_line = False
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
             if wandb_error_detected:
                 continue
 
-            # Print normal logs until error appears
-            print(line, end='')
+            if in_error_line:
+                start = 0
+            else:
+                window = tail + chunk
+                match_end = _find_wandb_error(window)
+                if match_end == -1:
+                    out.write(chunk)
+                    out.flush()
+                    tail = window[-_WANDB_PATTERN_OVERLAP:]
+                    continue
+                in_error_line = True
+                start = max(match_end - len(tail), 0)
 
-            # Detect error and stop logs
-            if any(pattern in line for pattern in wandb_error_patterns):
-
-                wandb_error_detected = True
-
-                print(
-                    "\033[91m\n"
-                    "⚠️  WARNING: W&B authentication failed inside the container.\n"
-                    "\033[93mRemember to log in to W&B on the host,\n"
-                    "and avoid hardcoding the mode in the repo config.\033[0m\n"
-                )
+            # Print the rest of the offending line, then the warning
+            stop = _line_end(chunk, start)
+            if stop == -1:
+                out.write(chunk)
+                out.flush()
+                continue
+            out.write(chunk[:stop])
+            out.flush()
+            warn_wandb_error()
+            wandb_error_detected = True
 
-                # Stop reading further logs but allow container to finish
-                break
+        if in_error_line and not wandb_error_detected:
+            warn_wandb_error()
+            wandb_error_detected = True
 
         process.wait()
         if process.returncode != 0:
@@ -100,15 +166,8 @@ def run_command_in_container(container_name: str, command: str, workdir: str) ->
     ]
 
     try:
-        process = subprocess.Popen(
-            docker_command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-        )
-        for line in iter(process.stdout.readline, ''):
-            print(line, end='')
-        process.wait()
+        # Nothing to inspect here: let the container output go straight to our stdout.
+        process = subprocess.run(docker_command, stderr=subprocess.STDOUT, check=False)
         if process.returncode != 0:
             print(f"\n[bold red]Error running command. Exit code: {process.returncode}[/bold red]")
         else:
@@ -166,7 +225,11 @@ def interactive_shell(project_name: str, config: dict):
     try:
         subprocess.run(docker_run_cmd, check=True)
         
-        if typer.confirm(f"Do you want to save the changes to the image '{image_tag}'?"):
+        # An unchanged container would only produce an identical new layer.
+        diff = subprocess.run(["docker", "diff", container_name], capture_output=True, check=True)
+        if not diff.stdout.strip():
+            print("No changes in the container, skipping commit.")
+        elif typer.confirm(f"Do you want to save the changes to the image '{image_tag}'?"):
             print(f"Committing changes to image '{image_tag}'...")
             subprocess.run(["docker", "commit", container_name, image_tag], check=True)
             print("Changes saved successfully.")
@@ -185,11 +248,7 @@ def create_docker_template( project_name: str ):
     Create a new Dockerfile and an empty requirements.txt file from a template for a Python project.
     """
     ensure_project_initialized(project_name)
-    template_path = Path(__file__).parent / "templates" / "Dockerfile.template"
-    with open(template_path, "r") as f:
-        template_content = f.read()
-
-    dockerfile_content = template_content.replace("{{ project_name }}", project_name)
+    dockerfile_content = _jinja_env().get_template("Dockerfile.template").render(project_name=project_name)
 
     output_dir = Path("output") / project_name
     dockerfile_path = output_dir / "Dockerfile"
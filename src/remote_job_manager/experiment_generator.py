@@ -1,8 +1,21 @@
+import configparser
+import functools
+import math
 import os
-import yaml
+import re
+import shlex
 from pathlib import Path
 from rich import print
+from rich.console import Console
 from itertools import product
+from concurrent.futures import ThreadPoolExecutor
+from .config import load_cached, load_yaml
+
+# Plain console for bulk output: skips Rich's markup and highlight passes.
+console = Console(highlight=False, markup=False)
+
+# Matches {{KEY}} placeholders in the SLURM template.
+_SLURM_VAR_RE = re.compile(r"\{\{(\w+)\}\}")
 
 def ensure_slurm_runs_dirs(project_name: str):
     """
@@ -23,14 +36,21 @@ def load_cluster_config(project_name: str, cluster_name: str) -> dict:
         print(f"Error: Cluster configuration file not found at {config_path}")
         raise FileNotFoundError
     
-    config = {}
-    with open(config_path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#'):
-                key, value = line.split('=', 1)
-                config[key.strip()] = value.strip()
-    return config
+    return load_cached(config_path, _parse_cluster_conf)
+
+def _parse_cluster_conf(f) -> dict:
+    """
+    Parses KEY=VALUE lines from a cluster .conf file, skipping comments.
+    """
+    # The file has no section header, so parse it under a synthetic one.
+    # Lines are stripped first so indentation never turns into a continuation
+    # line, and only '#' starts a comment, as in the original line parser.
+    parser = configparser.ConfigParser(
+        delimiters=("=",), comment_prefixes=("#",), interpolation=None, strict=False
+    )
+    parser.optionxform = str  # keep KEY case as written
+    parser.read_string("[cluster]\n" + "\n".join(line.strip() for line in f))
+    return dict(parser["cluster"])
 
 def load_experiment_config(project_name: str, experiment_name: str) -> tuple[dict, dict]:
     """
@@ -48,48 +68,47 @@ def load_experiment_config(project_name: str, experiment_name: str) -> tuple[dic
         print(f"Error: Experiment grid.yaml not found at {grid_path}")
         raise FileNotFoundError
 
-    with open(config_path, 'r') as f:
-        experiment_config = yaml.safe_load(f)
-    
-    with open(grid_path, 'r') as f:
-        grid_config = yaml.safe_load(f)
-        
+    experiment_config = load_yaml(config_path)
+    grid_config = load_yaml(grid_path)
+
     return experiment_config, grid_config
 
-def generate_grid_combinations(grid_config: dict) -> list[dict]:
+def count_grid_combinations(grid_config: dict) -> int:
     """
-    Generates all combinations of parameters from the grid configuration.
+    Returns how many parameter combinations the grid configuration expands to.
     """
-    keys = grid_config.keys()
-    values = grid_config.values()
-    
-    combinations = []
-    for combo in product(*values):
-        combinations.append(dict(zip(keys, combo)))
-    return combinations
+    return math.prod(len(v) for v in grid_config.values())
 
-def build_command(base_command: str, params: dict) -> str:
+def format_flag(key: str, value) -> str:
     """
-    Constructs the shell command from the base command and a set of parameters.
+    Formats one command-line flag. Boolean values become bare flags (or an
+    empty string when False); everything else is shell-quoted.
     """
-    cmd_parts = [base_command]
-    for key, value in params.items():
-        # Handle boolean flags
-        if isinstance(value, bool):
-            if value:
-                cmd_parts.append(f"--{key}")
-        else:
-            cmd_parts.append(f"--{key} {value}")
-    return " ".join(cmd_parts)
+    if isinstance(value, bool):
+        return f"--{key}" if value else ""
+    return f"--{key} {shlex.quote(str(value))}"
+
+def join_flags(base_command: str, flags) -> str:
+    """
+    Joins pre-formatted flags onto the base command, skipping empty ones.
+    """
+    return " ".join((base_command, *filter(None, flags)))
+
+@functools.lru_cache(maxsize=8)
+def _load_slurm_template(path: str, mtime_ns: int) -> str:
+    """
+    Reads a SLURM template; the mtime in the cache key drops stale entries.
+    """
+    return Path(path).read_text()
 
 def render_slurm_template(template_content: str, slurm_params: dict) -> str:
     """
     Renders the SLURM template with the provided parameters.
     """
-    rendered_script = template_content
-    for key, value in slurm_params.items():
-        rendered_script = rendered_script.replace(f"{{{{{key}}}}}", str(value))
-    return rendered_script
+    return _SLURM_VAR_RE.sub(
+        lambda m: str(slurm_params[m.group(1)]) if m.group(1) in slurm_params else m.group(0),
+        template_content,
+    )
 
 def generate_jobs(project_name: str, cluster_name: str, experiment_name: str):
     """
@@ -103,22 +122,25 @@ def generate_jobs(project_name: str, cluster_name: str, experiment_name: str):
 
     # Load SLURM template
     slurm_template_path = Path(__file__).parent / "templates" / "slurm.template"
-    with open(slurm_template_path, 'r') as f:
-        slurm_template_content = f.read()
+    slurm_template_content = _load_slurm_template(str(slurm_template_path), slurm_template_path.stat().st_mtime_ns)
 
-    # Generate parameter combinations
-    param_combinations = generate_grid_combinations(grid_config)
+    # Count parameter combinations without materializing them
+    total = count_grid_combinations(grid_config)
 
     # Output directory for generated runs
     runs_output_dir = Path("output") / project_name / "slurm_runs" / "runs" / cluster_name / experiment_name
     runs_output_dir.mkdir(parents=True, exist_ok=True)
 
-    print(f"Generating {len(param_combinations)} SLURM jobs for experiment '{experiment_name}' on cluster '{cluster_name}'...")
+    print(f"Generating {total} SLURM jobs for experiment '{experiment_name}' on cluster '{cluster_name}'...")
 
-    for i, params in enumerate(param_combinations):
+    # Format each axis value's flag once; the product repeats it many times
+    base_cmd = experiment_config.get("script", "python main.py") # Default script
+    axis_flags = [[format_flag(key, value) for value in values] for key, values in grid_config.items()]
+
+    scripts = []
+    for i, flags in enumerate(product(*axis_flags)):
         # Build the experiment command
-        base_cmd = experiment_config.get("script", "python main.py") # Default script
-        full_cmd = build_command(base_cmd, params)
+        full_cmd = join_flags(base_cmd, flags)
 
         # Prepare SLURM parameters
         slurm_params = {
@@ -137,11 +159,12 @@ def generate_jobs(project_name: str, cluster_name: str, experiment_name: str):
         # Render SLURM script
         rendered_slurm_script = render_slurm_template(slurm_template_content, slurm_params)
 
-        # Save SLURM script
         run_id = f"{i:04d}" # Pad with zeros for consistent naming
-        output_script_path = runs_output_dir / f"run_{run_id}.slurm"
-        with open(output_script_path, 'w') as f:
-            f.write(rendered_slurm_script)
-        print(f"Generated: {output_script_path}")
+        scripts.append((runs_output_dir / f"run_{run_id}.slurm", rendered_slurm_script))
+
+    # Save SLURM scripts concurrently; file writes release the GIL
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        list(executor.map(lambda item: item[0].write_text(item[1]), scripts))
+    console.out("\n".join(f"Generated: {path}" for path, _ in scripts))
 
     print(f"Successfully generated SLURM jobs in {runs_output_dir}")
@@ -1,9 +1,13 @@
-import hydra
-from hydra.core.hydra_config import HydraConfig
-from omegaconf import DictConfig, OmegaConf
-from jinja2 import Environment, FileSystemLoader
+# Hydra, OmegaConf and Jinja2 are imported where they are used so that
+# importing this module stays cheap.
 from pathlib import Path
+import functools
 import os
+import shlex
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from omegaconf import DictConfig
 
 
 # ------------------------------
@@ -22,25 +26,43 @@ HYDRA_INTERNAL_KEYS = {
     "grid",
 }
 
+BYTECODE_CACHE_DIR = Path.home() / ".cache" / "remote-job-manager" / "jinja"
+
 def load_template():
     """Load the Jinja2 SLURM template from the project directory."""
+    import hydra
+
     original_cwd = Path(hydra.utils.get_original_cwd())
     template_dir = original_cwd / "src" / "remote_job_manager" / "templates"
-    env = Environment(loader=FileSystemLoader(template_dir))
+    return _compiled_template(str(template_dir))
+
+
+@functools.lru_cache(maxsize=None)
+def _compiled_template(template_dir: str):
+    """Parse and compile the SLURM template once per template directory.
+
+    Each generated job runs in its own process, so the compiled bytecode is
+    also cached on disk and reused by later launches.
+    """
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    env = Environment(
+        loader=FileSystemLoader(template_dir),
+        bytecode_cache=FileSystemBytecodeCache(str(BYTECODE_CACHE_DIR)),
+        auto_reload=False,
+        cache_size=400,
+    )
     return env.get_template("slurm.template.jinja2")
 
 
-def extract_params(cfg: DictConfig) -> dict:
+def extract_params(cfg: dict) -> dict:
     """Extract experiment parameters + grid parameters, excluding Hydra internals."""
-    params = {}
-
     # experiment defaults
-    params.update(OmegaConf.to_container(cfg.experiment, resolve=True))
+    params = dict(cfg["experiment"])
 
     # everything else inside cfg (grid params)
-    for key, value in cfg.items():
-        if key not in HYDRA_INTERNAL_KEYS:
-            params[key] = value
+    params.update((key, value) for key, value in cfg.items() if key not in HYDRA_INTERNAL_KEYS)
 
     params.pop("script", None)
     return params
@@ -48,18 +70,23 @@ def extract_params(cfg: DictConfig) -> dict:
 
 def build_command(base_cmd: str, params: dict) -> str:
     """Convert parameters into CLI flags."""
-    flags = [f"--{k}={v}" for k, v in params.items()]
-    return base_cmd + " " + " ".join(flags)
+    return " ".join((base_cmd, *(f"--{k}={shlex.quote(str(v))}" for k, v in params.items())))
 
 
 # ------------------------------
 #  Main Hydra Entry Point
 # ------------------------------
-@hydra.main(version_base=None, config_path=None)
-def main(cfg: DictConfig) -> None:
+def main(cfg: "DictConfig") -> None:
+    from omegaconf import OmegaConf
 
     OmegaConf.set_struct(cfg, False)
 
+    # Resolve the whole config into plain containers once; DictConfig
+    # attribute access is slow and everything below only reads it.
+    cfg = OmegaConf.to_container(cfg, resolve=True)
+    experiment = cfg["experiment"]
+    project_name = cfg["project"]["general"]["project_name"]
+
     # Job index (supplied manually)
     job_index = int(cfg.get("job_index", 0))
 
@@ -70,27 +97,26 @@ def main(cfg: DictConfig) -> None:
     params = extract_params(cfg)
 
     # Build command
-    cmd = build_command(cfg.experiment.script, params)
-    project_name = cfg.project.general.project_name
-    remote_base_path = cfg.cluster.remote.remote_base_path
+    cmd = build_command(experiment["script"], params)
+    remote_base_path = cfg["cluster"]["remote"]["remote_base_path"]
     container= remote_base_path + "/" + project_name + "/" + project_name + ".sif"
     workdir="/" + project_name
     host_test_dir= remote_base_path + "/" + project_name + "/test"
-    wandb_mode= cfg.experiment.get("wandb_mode", "offline")
+    wandb_mode= experiment.get("wandb_mode", "offline")
 
     # Render SLURM
     slurm_text = template.render(
-        job_name=f"{cfg.project.general.project_name}-{job_index}",
+        job_name=f"{project_name}-{job_index}",
         cmd=cmd,
         wandb_mode=wandb_mode,
         host_test_dir=host_test_dir,
         container=container,
         workdir=workdir,
-        **cfg.cluster.slurm
+        **cfg["cluster"]["slurm"]
     )
 
     # Output
-    outdir = Path(cfg.slurm_output_dir)
+    outdir = Path(cfg["slurm_output_dir"])
     outdir.mkdir(parents=True, exist_ok=True)
     script_path = outdir / f"job_{job_index}.slurm"
 
@@ -99,4 +125,6 @@ def main(cfg: DictConfig) -> None:
 
 
 if __name__ == "__main__":
-    main()
+    import hydra
+
+    hydra.main(version_base=None, config_path=None)(main)()
@@ -1,40 +1,108 @@
+import functools
+import os
+import shlex
+import shutil
 import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from rich import print
 import typer
+from .utils import cached_sha256, echo_raw, stream_to_stdout
 
-def run_remote_command(remote_config: dict, command: str):
-    """
-    Executes a command on a remote server via SSH and streams the output.
-    """
-    host = remote_config["host"]
-    user = remote_config["user"]
-    port = remote_config["port"]
-    init_commands = remote_config.get("init_commands", [])
+# Parallel project sync: only split into per-entry rsyncs from this many
+# top-level entries.
+PARALLEL_SYNC_MIN_ENTRIES = 4
 
-    if init_commands:
-        command = " && ".join(init_commands) + " && " + command
+# Size of the thread pool shared by every concurrent ssh/rsync subprocess, which
+# also caps how many sessions are open on the multiplexed connection at once.
+REMOTE_IO_MAX_WORKERS = 8
 
-    ssh_command = [
+# Project sync backend: "rsync" (default) or "rclone", overridable with
+# RJM_SYNC_BACKEND. Very large trees switch to rclone automatically when it is
+# installed, since it stats and transfers many files concurrently.
+SYNC_BACKEND_ENV = "RJM_SYNC_BACKEND"
+RCLONE_MIN_ENTRIES = 5000
+RCLONE_TRANSFERS = 32
+RCLONE_CHECKERS = 16
+
+# Reuse one SSH connection for consecutive ssh/rsync calls to the same host
+# instead of paying a full handshake each time.
+SSH_MULTIPLEX_OPTIONS = [
+    "-o", "ControlMaster=auto",
+    "-o", "ControlPath=~/.ssh/cm-%r@%h:%p",
+    "-o", "ControlPersist=60s",
+]
+
+@functools.lru_cache(maxsize=None)
+def _ssh_prefix(host: str, user: str, port: int) -> tuple:
+    """
+    Returns the ssh argv for a remote, without the command; built once per remote.
+    """
+    return (
         "ssh",
         "-A",
         f"{user}@{host}",
         "-p", str(port),
         "-o", "StrictHostKeyChecking=no",
-        command
-    ]
+        *SSH_MULTIPLEX_OPTIONS,
+    )
+
+@functools.lru_cache(maxsize=None)
+def _rsync_ssh_transport(port: int) -> str:
+    """
+    Returns the `rsync -e` ssh transport string for a port; built once per port.
+    """
+    return f"ssh -p {port} -o StrictHostKeyChecking=no {' '.join(SSH_MULTIPLEX_OPTIONS)}"
+
+@functools.lru_cache(maxsize=None)
+def _io_executor() -> ThreadPoolExecutor:
+    """
+    Returns the thread pool shared by all concurrent remote subprocesses; created on first use.
+    """
+    return ThreadPoolExecutor(max_workers=REMOTE_IO_MAX_WORKERS, thread_name_prefix="rjm-remote")
+
+def _remote_base_path(remote_config: dict) -> str:
+    """
+    Returns the remote base path, only falling back to the home directory when unset.
+    """
+    remote_base_path = remote_config.get("remote_base_path")
+    if remote_base_path is None:
+        remote_base_path = str(Path.home())
+    return remote_base_path
+
+def _remote_ssh_command(remote_config: dict, command: str) -> list:
+    """
+    Returns the ssh argv that runs a command on the remote after its init_commands.
+    """
+    init_commands = remote_config.get("init_commands", [])
+    if init_commands:
+        command = " && ".join(init_commands) + " && " + command
+    return [*_ssh_prefix(remote_config["host"], remote_config["user"], remote_config["port"]), command]
+
+def run_remote_command(remote_config: dict, command: str, script: str = None):
+    """
+    Executes a command on a remote server via SSH and streams the output.
+    If a script is given, it is fed to the remote command's stdin.
+    """
+    host = remote_config["host"]
+    ssh_command = _remote_ssh_command(remote_config, command)
 
     print(f"Executing on remote '{host}': {' '.join(ssh_command)}")
     
     try:
         process = subprocess.Popen(
             ssh_command,
+            stdin=subprocess.PIPE if script is not None else None,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
+            bufsize=1 << 20,
         )
-        for line in iter(process.stdout.readline, ''):
-            print(line, end='')
+        if script is not None:
+            process.stdin.write(script.encode())
+            process.stdin.close()
+        stream_to_stdout(process.stdout)
         process.wait()
         if process.returncode != 0:
             raise subprocess.CalledProcessError(process.returncode, process.args)
@@ -45,9 +113,101 @@ def run_remote_command(remote_config: dict, command: str):
         print(f"\nError executing remote command. Return code: {e.returncode}")
         raise typer.Exit(code=1)
 
+def run_remote_commands_parallel(remote_config: dict, commands: list, max_parallel: int = 8):
+    """
+    Executes several commands on a remote server concurrently via SSH on the shared
+    remote thread pool, at most `max_parallel` at a time over the multiplexed connection.
+    Each command's output is printed once it finishes, in the order given.
+    """
+    if not commands:
+        return
+    host = remote_config["host"]
+    ssh_commands = [_remote_ssh_command(remote_config, command) for command in commands]
+    gate = threading.BoundedSemaphore(max_parallel)
+
+    def run(ssh_command):
+        with gate:
+            # Like `ssh -n`: concurrent sessions must not compete for the terminal's input
+            return subprocess.run(
+                ssh_command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+            )
+
+    parallel = min(max_parallel, REMOTE_IO_MAX_WORKERS, len(commands))
+    print(f"Executing {len(commands)} commands on remote '{host}' ({parallel} at a time)...")
+    try:
+        futures = [_io_executor().submit(run, ssh_command) for ssh_command in ssh_commands]
+        results = [future.result() for future in futures]
+    except FileNotFoundError:
+        print("Error: 'ssh' command not found. Please ensure OpenSSH client is installed and in your PATH.")
+        raise typer.Exit(code=1)
+
+    failed = []
+    for command, result in zip(commands, results):
+        print(f"--- {command} ---")
+        sys.stdout.flush()
+        sys.stdout.buffer.write(result.stdout)
+        sys.stdout.buffer.flush()
+        if result.returncode != 0:
+            failed.append((command, result.returncode))
+
+    if failed:
+        for command, returncode in failed:
+            print(f"Error executing remote command '{command}'. Return code: {returncode}")
+        raise typer.Exit(code=1)
+
+def _select_sync_backend(entry_count: int) -> str:
+    """
+    Returns the project sync backend, honouring RJM_SYNC_BACKEND when set.
+    """
+    backend = os.environ.get(SYNC_BACKEND_ENV)
+    if backend:
+        backend = backend.lower()
+        if backend not in ("rsync", "rclone"):
+            print(f"Error: Unknown sync backend '{backend}'. Use 'rsync' or 'rclone'.")
+            raise typer.Exit(code=1)
+        return backend
+    if entry_count > RCLONE_MIN_ENTRIES and shutil.which("rclone"):
+        return "rclone"
+    return "rsync"
+
+def _sync_project_with_rclone(remote_config: dict, local_project_dir: Path, remote_project_dir: str):
+    """
+    Copies the local project directory to the remote over SFTP with rclone.
+    """
+    # On-the-fly sftp remote, so no rclone.conf entry is needed. `copy` rather
+    # than `sync` so files that only exist on the remote are kept, as with rsync.
+    # sftp does not expand `~`, but relative paths already start at the home dir.
+    if remote_project_dir.startswith("~/"):
+        remote_project_dir = remote_project_dir[2:]
+    remote_dest = (
+        f":sftp,host={remote_config['host']},user={remote_config['user']},"
+        f"port={remote_config['port']}:{remote_project_dir}"
+    )
+    rclone_command = [
+        "rclone",
+        "copy",
+        f"--transfers={RCLONE_TRANSFERS}",
+        f"--checkers={RCLONE_CHECKERS}",
+        "--stats-one-line",
+        "--stats-log-level", "NOTICE",
+        str(local_project_dir),
+        remote_dest,
+    ]
+    try:
+        result = subprocess.run(rclone_command, check=True, capture_output=True, text=True)
+        echo_raw(result.stderr)
+        print("Sync completed successfully.")
+    except FileNotFoundError:
+        print("Error: 'rclone' command not found. Please ensure rclone is installed and in your PATH.")
+        raise typer.Exit(code=1)
+    except subprocess.CalledProcessError as e:
+        print(f"Error syncing project to remote. Return code: {e.returncode}\n{e.stderr}")
+        raise typer.Exit(code=1)
+
 def sync_project_to_remote(remote_config: dict, project_name: str):
     """
-    Syncs the local project output directory to the remote server using rsync.
+    Syncs the local project output directory to the remote server using rsync,
+    or rclone for very large trees (see RJM_SYNC_BACKEND).
     """
     host = remote_config["host"]
     user = remote_config["user"]
@@ -58,23 +218,43 @@ def sync_project_to_remote(remote_config: dict, project_name: str):
         print(f"Warning: Local project directory {local_project_dir} not found. Nothing to sync.")
         return
 
-    remote_base_path = remote_config.get("remote_base_path", str(Path.home()))
-    
-    # Ensure the destination directory exists on the remote
-    setup_command = f"mkdir -p {remote_base_path}/{project_name}"
-    run_remote_command(remote_config, setup_command)
+    remote_base_path = _remote_base_path(remote_config)
+    remote_project_dir = f"{remote_base_path}/{project_name}"
 
-    rsync_command = [
+    children = sorted(entry.name for entry in os.scandir(local_project_dir))
+    if _select_sync_backend(len(children)) == "rclone":
+        print(f"Syncing project '{project_name}' to remote '{host}' at '{remote_base_path}' with rclone...")
+        _sync_project_with_rclone(remote_config, local_project_dir, remote_project_dir)
+        return
+
+    # The remote rsync creates the destination directory itself,
+    # saving a separate SSH round-trip for mkdir.
+    rsync_base = [
         "rsync",
-        "-avz",
-        "-e", f"ssh -p {port} -o StrictHostKeyChecking=no",
-        f"{local_project_dir}/",
-        f"{user}@{host}:{remote_base_path}/{project_name}/",
+        "-az",
+        "--partial",
+        "--stats",
+        f"--rsync-path=mkdir -p {remote_project_dir} && rsync",
+        "-e", _rsync_ssh_transport(port),
     ]
+    remote_dest = f"{user}@{host}:{remote_project_dir}/"
+
+    # With enough top-level entries, one rsync per entry overlaps file-list
+    # building with transfer; otherwise a single rsync is cheaper.
+    if len(children) < PARALLEL_SYNC_MIN_ENTRIES:
+        rsync_commands = [rsync_base + [f"{local_project_dir}/", remote_dest]]
+    else:
+        rsync_commands = [rsync_base + [str(local_project_dir / name), remote_dest] for name in children]
 
     print(f"Syncing project '{project_name}' to remote '{host}' at '{remote_base_path}'...")
     try:
-        subprocess.run(rsync_command, check=True, capture_output=True, text=True)
+        futures = [
+            _io_executor().submit(subprocess.run, command, check=True, capture_output=True, text=True)
+            for command in rsync_commands
+        ]
+        results = [future.result() for future in futures]
+        for result in results:
+            echo_raw(result.stdout)
         print("Sync completed successfully.")
     except FileNotFoundError:
         print("Error: 'rsync' command not found. Please ensure rsync is installed and in your PATH.")
@@ -95,17 +275,26 @@ def sync_file_to_remote(remote_config: dict, local_file_path: Path, remote_dest_
         print(f"Error: Local file {local_file_path} not found.")
         raise typer.Exit(code=1)
 
+    # SIF images are already squashfs-compressed; zlib on top only burns CPU
+    archive_flags = "-a" if local_file_path.suffix == ".sif" else "-az"
+
     rsync_command = [
         "rsync",
-        "-avz",
-        "-e", f"ssh -p {port} -o StrictHostKeyChecking=no",
+        archive_flags,
+        "--partial",
+        "--stats",
+        # Send only changed blocks of large files such as the .sif image
+        "--no-whole-file",
+        f"--rsync-path=mkdir -p {remote_dest_path} && rsync",
+        "-e", _rsync_ssh_transport(port),
         str(local_file_path),
         f"{user}@{host}:{remote_dest_path}/",
     ]
 
     print(f"Syncing file '{local_file_path.name}' to remote '{host}' at '{remote_dest_path}'...")
     try:
-        subprocess.run(rsync_command, check=True, capture_output=True, text=True)
+        result = subprocess.run(rsync_command, check=True, capture_output=True, text=True)
+        echo_raw(result.stdout)
         print("Sync completed successfully.")
     except FileNotFoundError:
         print("Error: 'rsync' command not found. Please ensure rsync is installed and in your PATH.")
@@ -114,20 +303,53 @@ def sync_file_to_remote(remote_config: dict, local_file_path: Path, remote_dest_
         print(f"Error syncing file to remote. Return code: {e.returncode}\n{e.stderr}")
         raise typer.Exit(code=1)
 
+def _remote_shell_path(remote_path: str) -> str:
+    """
+    Quotes a remote path for the remote shell, keeping a leading `~` expandable.
+    """
+    if remote_path == "~":
+        return '"$HOME"'
+    if remote_path.startswith("~/"):
+        return '"$HOME"/' + shlex.quote(remote_path[2:])
+    return shlex.quote(remote_path)
+
+def _remote_sha256(remote_config: dict, remote_path: str):
+    """
+    Returns the SHA-256 of a file on the remote, or None if it cannot be read.
+    """
+    ssh_command = [
+        *_ssh_prefix(remote_config["host"], remote_config["user"], remote_config["port"]),
+        f"sha256sum -- {_remote_shell_path(remote_path)} 2>/dev/null",
+    ]
+    try:
+        result = subprocess.run(ssh_command, capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    fields = result.stdout.split()
+    if result.returncode != 0 or not fields:
+        return None
+    return fields[0]
+
 def prepare_remote_test_env(remote_config: dict, project_name: str, project_config: dict):
     """
     Prepares the test environment on a remote server by syncing the SIF file
     and then running a setup script on the remote.
     """
-    # Define local and remote paths
-    local_sif_path = Path(f"output/{project_name}/{project_name}.sif")
-    remote_base_path = remote_config.get("remote_base_path", str(Path.home()))
-    remote_project_dir = f"{remote_base_path}/{project_name}"
+    # Define local and remote paths once; everything below works on these
+    local_sif_path = Path("output", project_name, f"{project_name}.sif")
+    remote_project_dir = f"{_remote_base_path(remote_config)}/{project_name}"
     remote_test_dir = f"{remote_project_dir}/test"
 
     # Step 1: Sync the .sif file from local to remote
+    # Images are GB-sized and rarely change: skip the transfer when the remote
+    # copy already has the same hash.
     print(f"--- Syncing Singularity image to {remote_project_dir} ---")
-    sync_file_to_remote(remote_config, local_sif_path, remote_project_dir)
+    if local_sif_path.is_file() and _remote_sha256(
+        remote_config, f"{remote_project_dir}/{local_sif_path.name}"
+    ) == cached_sha256(local_sif_path):
+        print("Remote Singularity image is up to date. Skipping sync.")
+    else:
+        sync_file_to_remote(remote_config, local_sif_path, remote_project_dir)
 
     # Step 2: Create dirs, clone repo, and download dataset on remote
     print("--- Setting up test environment on remote ---")
@@ -140,8 +362,9 @@ def prepare_remote_test_env(remote_config: dict, project_name: str, project_conf
         script_template = f.read()
         
     # Inject variables into the script
-    command = script_template.replace("{{remote_test_dir}}", remote_test_dir)
-    command = command.replace("{{repo_url}}", repo_url)
-    command = command.replace("{{dataset_command}}", dataset_command)
-    
-    run_remote_command(remote_config, command)
+    script = script_template.replace("{{remote_test_dir}}", remote_test_dir)
+    script = script.replace("{{repo_url}}", repo_url)
+    script = script.replace("{{dataset_command}}", dataset_command)
+
+    # Stream the script over stdin instead of passing it on the command line
+    run_remote_command(remote_config, "bash -s", script=script)
@@ -1,37 +1,52 @@
 import subprocess
 from pathlib import Path
-from rich import print
+from collections import deque
+from rich import print, get_console
 import typer
 import os
+import sys
+from .utils import cached_sha256, stream_to_stdout
 
 def convert_docker_to_singularity(image_name: str, output_dir: Path):
     """
     Converts a Docker image to a Singularity image (.sif).
     """
-    sif_filename = f"{image_name.split(':')[0]}.sif"
+    sif_filename = f"{image_name.partition(':')[0]}.sif"
     sif_path = output_dir / sif_filename
+    sif_path_str = str(sif_path)
     docker_image_uri = f"docker-daemon://{image_name}"
 
-    print(f"Converting Docker image '{image_name}' to Singularity image '{sif_path}'...")
+    # The build log can be huge; send it straight to a file instead of through Python.
+    log_path = output_dir / f"{sif_path.stem}.build.log"
+
+    print(f"Converting Docker image '{image_name}' to Singularity image '{sif_path_str}'...")
+    print(f"Build log: {log_path}")
 
     try:
-        process = subprocess.Popen(
-            ["singularity", "build", str(sif_path), docker_image_uri],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-        )
-        for line in iter(process.stdout.readline, ''):
-            print(line, end='')
-        process.wait()
+        with open(log_path, "wb") as log_file, get_console().status("Building Singularity image..."):
+            process = subprocess.Popen(
+                ["singularity", "build", sif_path_str, docker_image_uri],
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+            )
+            process.wait()
         if process.returncode != 0:
             raise subprocess.CalledProcessError(process.returncode, process.args)
-        print(f"\nSingularity image created successfully: {sif_path}")
+        print(f"\nSingularity image created successfully: {sif_path_str}")
+        # Record the image hash now so remote syncs can skip an unchanged image
+        with get_console().status("Hashing Singularity image..."):
+            cached_sha256(sif_path)
     except FileNotFoundError:
         print("Error: 'singularity' command not found. Please ensure Singularity is installed and in your PATH.")
         raise typer.Exit(code=1)
     except subprocess.CalledProcessError as e:
         print(f"\nError converting Docker image to Singularity. Return code: {e.returncode}")
+        with open(log_path, "rb") as log_file:
+            tail = deque(log_file, maxlen=20)
+        print(f"Last lines of {log_path}:")
+        sys.stdout.flush()
+        sys.stdout.buffer.write(b"".join(tail))
+        sys.stdout.buffer.flush()
         raise typer.Exit(code=1)
 
 def run_test_in_singularity(sif_path: Path, test_dir: Path, run_command: str, use_gpus: bool, wandb_mode: str, project_name: str):
@@ -62,10 +77,9 @@ def run_test_in_singularity(sif_path: Path, test_dir: Path, run_command: str, us
             env=env,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
+            bufsize=1 << 20,
         )
-        for line in iter(process.stdout.readline, ''):
-            print(line, end='')
+        stream_to_stdout(process.stdout)
         process.wait()
         if process.returncode != 0:
             raise subprocess.CalledProcessError(process.returncode, process.args)
@@ -1,4 +1,7 @@
 #!/bin/bash
+# The script arrives on stdin (bash -s). Grouping it makes bash read all of it
+# before running anything, so commands that read stdin cannot eat the rest.
+{
 set -e
 echo "Creating test directory..."
 mkdir -p {{remote_test_dir}}
@@ -21,3 +24,4 @@ else
 fi
 
 echo "---- Remote test environment setup complete ----"
+}
@@ -1,13 +1,105 @@
+import hashlib
+import os
+import sys
+import threading
+import time
 from pathlib import Path
-from rich import print
+
+# Extra status lines (skipped clones, cached downloads) only show with RJM_VERBOSE set
+VERBOSE = bool(os.environ.get("RJM_VERBOSE"))
+
+def log(message: str, verbose: bool = False):
+    """
+    Writes a plain status line to stdout, without Rich's markup parsing or its
+    console lock, so it is cheap to call from worker threads.
+    Lines marked `verbose` are dropped unless RJM_VERBOSE is set.
+    """
+    if verbose and not VERBOSE:
+        return
+    sys.stdout.write(message + "\n")
+    # Keep ordering with child processes that share the terminal
+    sys.stdout.flush()
+
+# Projects whose output directory was recently seen, keyed to the
+# time.monotonic() of that check; entries are trusted for a short TTL.
+INITIALIZED_TTL = 30.0
+_initialized_cache: dict = {}
+_initialized_lock = threading.Lock()
 
 def ensure_project_initialized(project_name: str):
     """
     Ensures that the output directory for a project exists.
     If the directory does not exist, it will be created with open permissions.
+    A successful check is remembered for INITIALIZED_TTL seconds.
     """
+    checked_at = _initialized_cache.get(project_name)
+    if checked_at is not None and time.monotonic() - checked_at < INITIALIZED_TTL:
+        return
     output_dir = Path("output") / project_name
-    if not output_dir.exists():
-        print(f"Project '{project_name}' not initialized. Creating output directory...")
-        output_dir.mkdir(parents=True, exist_ok=True)
-        print(f"Output directory created at: {output_dir}")
+    # A single mkdir both checks and creates; EEXIST is the common case.
+    try:
+        output_dir.mkdir(parents=True)
+    except FileExistsError:
+        pass
+    else:
+        log(f"Project '{project_name}' not initialized. Created output directory at: {output_dir}")
+    with _initialized_lock:
+        _initialized_cache[project_name] = time.monotonic()
+
+def forget_project_initialized(project_name: str):
+    """
+    Drops a project from the initialization cache so the next check hits the filesystem.
+    """
+    with _initialized_lock:
+        _initialized_cache.pop(project_name, None)
+
+def stream_to_stdout(stream):
+    """
+    Copies a subprocess's byte stream to stdout as it arrives, without decoding
+    or passing each line through Rich.
+    """
+    sys.stdout.flush()
+    out = sys.stdout.buffer
+    while True:
+        chunk = stream.read1(1 << 16)
+        if not chunk:
+            break
+        out.write(chunk)
+        out.flush()
+
+def echo_raw(text: str):
+    """
+    Writes a tool's captured output to stdout verbatim, without Rich markup
+    parsing or highlighting.
+    """
+    if text and not text.endswith("\n"):
+        text += "\n"
+    sys.stdout.write(text)
+
+def cached_sha256(path: Path) -> str:
+    """
+    Returns the SHA-256 of a file, kept in a `<name>.sha256` sidecar that is
+    trusted only while the file's size and mtime match the ones recorded in it.
+    """
+    sidecar = path.with_name(path.name + ".sha256")
+    st = path.stat()
+    stamp = f"{st.st_size} {st.st_mtime_ns}"
+    try:
+        lines = sidecar.read_text().splitlines()
+        if len(lines) >= 2 and lines[1].strip() == stamp:
+            return lines[0].split()[0]
+    except (OSError, IndexError):
+        pass
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    hexdigest = digest.hexdigest()
+    try:
+        # sha256sum layout on the first line, so the file can be checked by hand;
+        # the second line records the size and mtime the hash was taken at.
+        sidecar.write_text(f"{hexdigest}  {path.name}\n{stamp}\n")
+    except OSError:
+        pass
+    return hexdigest
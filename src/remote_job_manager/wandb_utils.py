@@ -1,15 +1,18 @@
-from pathlib import Path
+import os
+
+# Host-side W&B credentials, resolved once at import
+_HOME = os.path.expanduser("~")
+_WANDB_CFG = os.path.join(_HOME, ".config", "wandb")
+_NETRC = os.path.join(_HOME, ".netrc")
 
 def add_wandb_volumes(docker_run_cmd: list, wandb_mode: str) -> list:
     if wandb_mode:
         docker_run_cmd.extend(["-e", f"WANDB_MODE={wandb_mode}"])
+        # Credentials are only needed (and only looked up) in online mode
         if wandb_mode == "online":
-            home_dir = Path.home()
-            wandb_config = home_dir / ".config" / "wandb"
-            netrc = home_dir / ".netrc"
-            if wandb_config.exists():
-                docker_run_cmd.extend(["-v", f"{wandb_config}:/root/.config/wandb"])
-            if netrc.exists():
-                docker_run_cmd.extend(["-v", f"{netrc}:/root/.netrc"])
-    
-    return docker_run_cmd
\ No newline at end of file
+            if os.path.exists(_WANDB_CFG):
+                docker_run_cmd.extend(["-v", f"{_WANDB_CFG}:/root/.config/wandb"])
+            if os.path.exists(_NETRC):
+                docker_run_cmd.extend(["-v", f"{_NETRC}:/root/.netrc"])
+
+    return docker_run_cmd
@@ -1,15 +1,70 @@
+import functools
+import hashlib
+import os
+import shlex
+import shutil
 import subprocess
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from rich import print
 import typer
+from .utils import log
+
+# Absolute git path so, with close_fds=False, subprocess can spawn git via
+# posix_spawn instead of fork+exec and skip closing every inherited fd.
+GIT = shutil.which("git") or "git"
+
+# Clones and dataset downloads must land under this directory
+OUTPUT_ROOT = Path("output")
+
+# Upper bound on concurrent clones, whatever the caller asks for, to stay
+# clear of open-file limits and network saturation.
+MAX_CLONE_CONCURRENCY = 16
+
+# Lines of git stderr kept for the error message of a failed clone
+CLONE_STDERR_TAIL = 200
+
+# Opt-in (RJM_GIT_REFERENCE_CACHE=1): bare mirrors of cloned repositories, one
+# per URL. Clones borrow objects from them and only fetch what is missing over
+# the network. A mirror holds the full history, so it only pays off for
+# repositories that are cloned repeatedly; delete the directory to prune it.
+REFERENCE_CACHE_ENABLED = os.environ.get("RJM_GIT_REFERENCE_CACHE", "") not in ("", "0")
+REFERENCE_CACHE_DIR = Path.home() / ".cache" / "remote-job-manager" / "git-refs"
+_reference_locks: dict = {}
+_reference_locks_guard = threading.Lock()
+
+# Characters that need a real shell to mean what they say
+SHELL_METACHARACTERS = frozenset("|&;<>()$`*?[]{}~#!\n")
+
+# Target directories whose dataset is known to be downloaded in this process
+_downloaded: set = set()
+
+@functools.lru_cache(maxsize=None)
+def _resolved_root(root: Path) -> Path:
+    return root.resolve()
+
+def _safe_target(target_dir: Path, root: Path = OUTPUT_ROOT) -> str:
+    """
+    Resolves a target directory once and checks that it stays under `root`.
+    Returns the resolved path as a string, ready to hand to subprocesses.
+    """
+    resolved = target_dir.resolve()
+    try:
+        resolved.relative_to(_resolved_root(root))
+    except ValueError:
+        log(f"Error: Target directory {target_dir} is outside of {root}.")
+        raise typer.Exit(code=1)
+    return str(resolved)
 
 def is_valid_git_repo(url: str) -> bool:
     try:
         subprocess.run(
-            ["git", "ls-remote", url],
+            [GIT, "ls-remote", url],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            check=True
+            check=True,
+            close_fds=False,
         )
         return True
     except subprocess.CalledProcessError:
@@ -17,28 +72,171 @@ def is_valid_git_repo(url: str) -> bool:
     except Exception:
         return False
 
-def clone_repo(repo_url: str, target_dir: Path):
+def _update_reference_mirror(repo_url: str) -> str:
     """
-    Clones a git repository into a target directory, skipping if it already exists.
+    Creates or refreshes the local bare mirror of a repository and returns its path.
+    Failures are ignored: the clone then simply runs without a reference.
     """
-    git_dir = target_dir / ".git"
-    if git_dir.is_dir():
-        print(f"Repository already exists in {target_dir}, skipping clone.")
-        return
+    mirror = REFERENCE_CACHE_DIR / hashlib.sha1(repo_url.encode()).hexdigest()
+    with _reference_locks_guard:
+        lock = _reference_locks.setdefault(str(mirror), threading.Lock())
+    with lock:
+        if mirror.is_dir():
+            subprocess.run(
+                [GIT, "--git-dir", str(mirror), "remote", "update", "--prune"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                close_fds=False,
+            )
+        else:
+            # Build the mirror next to its final place and rename it in, so other
+            # processes never see a half-written one.
+            REFERENCE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            partial = f"{mirror}.partial-{os.getpid()}"
+            result = subprocess.run(
+                [GIT, "clone", "--mirror", "--quiet", repo_url, partial],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                close_fds=False,
+            )
+            try:
+                if result.returncode == 0:
+                    os.rename(partial, mirror)
+            except OSError:
+                pass
+            shutil.rmtree(partial, ignore_errors=True)
+    return str(mirror)
+
+def _clone_command(repo_url: str, target_dir: str, full_history: bool = False, reference: str = None) -> list:
+    """
+    Returns the git clone argv: shallow and blobless by default, with submodules
+    fetched in parallel. `full_history` clones every commit instead, and
+    `reference` borrows objects from a local mirror without staying tied to it.
+    """
+    command = [GIT, "clone", "--recurse-submodules", "-j", str(os.cpu_count() or 4)]
+    if not full_history:
+        command += ["--depth=1", "--filter=blob:none", "--shallow-submodules"]
+    if reference is not None:
+        command += ["--reference-if-able", reference, "--dissociate"]
+    return command + [repo_url, target_dir]
+
+def _targets_already_cloned(parent: str, names: list) -> set:
+    """
+    Returns which of `names` under `parent` already hold a git checkout.
+    Several targets share one scandir pass over the parent, which only stats
+    `.git` for entries that exist; a single target is one direct stat.
+    """
+    if len(names) == 1:
+        name = names[0]
+        return {name} if os.path.isdir(os.path.join(parent, name, ".git")) else set()
+
+    wanted = set(names)
+    try:
+        with os.scandir(parent) as entries:
+            return {
+                entry.name
+                for entry in entries
+                if entry.name in wanted
+                and entry.is_dir()
+                and os.path.isdir(os.path.join(entry.path, ".git"))
+            }
+    except FileNotFoundError:
+        return set()
 
+def _clone_one(repo_url: str, target_dir: str, full_history: bool = False):
+    """
+    Clones one repository, skipping it if it is not reachable.
+    Raises on git failures so the caller can stop the other clones.
+    """
     if not is_valid_git_repo(repo_url):
-        print(f"Warning: The repository URL '{repo_url}' is not valid or accessible, skipping clone.")
+        log(f"Warning: The repository URL '{repo_url}' is not valid or accessible, skipping clone.")
+        return
+
+    log(f"Cloning repository: {repo_url}")
+    reference = _update_reference_mirror(repo_url) if REFERENCE_CACHE_ENABLED else None
+    # Only the tail of git's stderr is kept, so memory stays bounded however
+    # noisy the clone is, and the pipe is drained as git writes to it.
+    process = subprocess.Popen(
+        _clone_command(repo_url, target_dir, full_history, reference),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        close_fds=False,
+    )
+    # Kept as bytes; it is only decoded if the clone fails
+    stderr_tail = deque(process.stderr, maxlen=CLONE_STDERR_TAIL)
+    process.stderr.close()
+    process.wait()
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, process.args, stderr=b"".join(stderr_tail))
+
+def clone_repos(pairs: list, concurrency: int = 8, full_history: bool = False):
+    """
+    Clones several (repo_url, target_dir) pairs concurrently, skipping any that already exist.
+    Stops at the first failed clone.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return
+
+    pairs = [(repo_url, _safe_target(target_dir)) for repo_url, target_dir in pairs]
+
+    names_by_parent = {}
+    for _, target_dir in pairs:
+        parent, name = os.path.split(target_dir)
+        names_by_parent.setdefault(parent, []).append(name)
+    already_cloned = {
+        os.path.join(parent, name)
+        for parent, names in names_by_parent.items()
+        for name in _targets_already_cloned(parent, names)
+    }
+
+    to_clone = []
+    for repo_url, target_dir in pairs:
+        if target_dir in already_cloned:
+            log(f"Repository already exists in {target_dir}, skipping clone.", verbose=True)
+        else:
+            to_clone.append((repo_url, target_dir))
+    if not to_clone:
         return
 
-    print(f"Cloning repository: {repo_url}")
+    max_workers = max(1, min(concurrency, MAX_CLONE_CONCURRENCY, len(to_clone)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_clone_one, repo_url, target_dir, full_history) for repo_url, target_dir in to_clone]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except FileNotFoundError:
+            for future in futures:
+                future.cancel()
+            log("Error: 'git' command not found. Please ensure Git is installed and in your PATH.")
+            raise typer.Exit(code=1)
+        except subprocess.CalledProcessError as e:
+            for future in futures:
+                future.cancel()
+            stderr = e.stderr.decode("utf-8", errors="replace")
+            log(f"Error cloning repository. Return code: {e.returncode}\n{stderr}")
+            raise typer.Exit(code=1)
+
+def clone_repo(repo_url: str, target_dir: Path, full_history: bool = False):
+    """
+    Clones a git repository into a target directory, skipping if it already exists.
+    """
+    clone_repos([(repo_url, target_dir)], full_history=full_history)
+
+def _direct_argv(command: str):
+    """
+    Returns the argv for a command that can be exec'd without a shell, or None
+    if it uses shell syntax (pipes, globs, variables, env assignments, ...).
+    """
+    if any(c in SHELL_METACHARACTERS for c in command):
+        return None
     try:
-        subprocess.run(["git", "clone", repo_url, str(target_dir)], check=True, capture_output=True, text=True)
-    except FileNotFoundError:
-        print("Error: 'git' command not found. Please ensure Git is installed and in your PATH.")
-        raise typer.Exit(code=1)
-    except subprocess.CalledProcessError as e:
-        print(f"Error cloning repository. Return code: {e.returncode}\n{e.stderr}")
-        raise typer.Exit(code=1)
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv or "=" in argv[0]:
+        return None
+    return argv
 
 def download_dataset(dataset_command: str, target_dir: Path):
     """
@@ -47,17 +245,35 @@ def download_dataset(dataset_command: str, target_dir: Path):
     if not dataset_command:
         return
 
+    key = str(target_dir)
+    if key in _downloaded:
+        log("Dataset already downloaded, skipping.", verbose=True)
+        return
+
+    cwd = _safe_target(target_dir)
     marker_file = target_dir / ".dataset_downloaded"
     if marker_file.exists():
-        print("Dataset already downloaded, skipping.")
+        _downloaded.add(key)
+        log("Dataset already downloaded, skipping.", verbose=True)
         return
 
-    print(f"Executing dataset download command:\n{dataset_command}")
-    print("\n--- WARNING: Executing arbitrary shell command. Ensure you trust the source of this command. ---\n")
+    log(f"Executing dataset download command:\n{dataset_command}")
+    log("\n--- WARNING: Executing arbitrary shell command. Ensure you trust the source of this command. ---\n")
     try:
-        subprocess.run(dataset_command, shell=True, check=True, cwd=target_dir)
+        # Simple commands (a plain curl/wget) are exec'd directly, skipping /bin/sh.
+        # Anything exec can't start (shell builtins, scripts without a shebang,
+        # non-executable files) still goes through the shell, which reports it.
+        argv = _direct_argv(dataset_command)
+        if argv is not None:
+            try:
+                subprocess.run(argv, check=True, cwd=cwd, close_fds=False)
+            except OSError:
+                argv = None
+        if argv is None:
+            subprocess.run(dataset_command, shell=True, check=True, cwd=cwd, close_fds=False)
         marker_file.touch()
-        print("Dataset download command executed successfully.")
+        _downloaded.add(key)
+        log("Dataset download command executed successfully.")
     except subprocess.CalledProcessError as e:
-        print(f"Error executing dataset download command. Return code: {e.returncode}")
+        log(f"Error executing dataset download command. Return code: {e.returncode}")
         raise typer.Exit(code=1)